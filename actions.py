@@ -38,22 +38,24 @@ Examples:
 Tips:
 - Easiest, if this file is executable (chmod +x). Otherwise use python3 ...
 
-This tool works as a state-machine through three global dicts
-- global_params         : Loaded (/inferred) parameters of the project
+This tool works from a frozen configuration, plus two global dicts computed from it
+- config                : Loaded (/inferred), then resolved parameters of the project (Config, passed to functions)
 - targets               : Known/recognized targets (based on CMakeCache)
-- shell_commands        : Valid invokations for the current parameters (based on params)
+- shell_commands        : Valid invokations for the current parameters (based on config)
 
 When running the tool, environment variables and flags/options together MUST provide resolution for the following parameters:
 
 Guarded param.          Env. var.               Flag/option                             CMake interface
 -------------           --------------          ------------------------------------    --------------------------------------
-project-name            $PROJECT_NAME           None                                    Always gets from env. var.
-project-build-type      $PROJECT_BUILD_TYPE     --debug, --release                      Via -DCMAKE_BUILD_TYPE=<Debug/Release>
-project-build-tests     $PROJECT_BUILD_TESTS    --with-tests, --build-test-project      Via -DBUILD_TESTS=<ON/OFF>
-project-use-conan       $PROJECT_USE_CONAN      --use-conan, --conan-install            Via -DUSE_CONAN=<ON/OFF>
+project_name            $PROJECT_NAME           None                                    Always gets from env. var.
+project_build_type      $PROJECT_BUILD_TYPE     --debug, --release                      Via -DCMAKE_BUILD_TYPE=<Debug/Release>
+project_build_tests     $PROJECT_BUILD_TESTS    --with-tests, --build-test-project      Via -DBUILD_TESTS=<ON/OFF>
+project_use_conan       $PROJECT_USE_CONAN      --use-conan, --conan-install            Via -DUSE_CONAN=<ON/OFF>
 
 Note: Flags/options will override environment variables.
 Note: If any of these are not resolvable, fallback settings are used.
+Note: CMake configures with the Ninja generator, unless --make is given or ninja isn't installed (then Unix Makefiles).
+      An already configured build dir keeps its generator (switching generator requires --clean-project first).
 
 Regarding VSCode configurations, see: https://code.visualstudio.com/docs/cpp/config-msvc#_create-a-build-task
 
@@ -64,178 +66,302 @@ Ver. 0.8.0
 Janus, 2023
 """
 
-import argparse
 import os
+import shlex
+import shutil
 import subprocess
-from functools import partial
-from collections import OrderedDict
+import sys
+from copy import deepcopy
+from dataclasses import dataclass, field, replace
+from functools import cache, lru_cache, partial
+from collections.abc import Mapping
 import re
-from typing import List, Dict, OrderedDict, Union
-import json
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Final, FrozenSet, Iterator, List, Optional, Tuple, Union
 
 
-from tools.actions_helper import is_on_str, guard_single
+from tools.actions_helper import is_on_str, positive_int, guard_single, print_json
 from tools.actions_helper import VSCodeLaunch, VSCodeTasks, VSCodeTask, VSCodeTaskOption, VSCodeTaskGroup, VSCodeProperties
 from tools.cmakecache_reader import CMakeCache
 from tools.conantoolchain_reader import get_conan_include_paths
 
 
-cppstd = 17     # No effect on CMake, only Conan and VSCode
+cppstd: Final[int] = 17     # No effect on CMake, only Conan and VSCode
 
-fallback = {
-    "project-name"              : "MISSING_PROJECT_NAME",
-    "project-build-type"        : "Debug",
-    "project-build-tests"       : "OFF",
-    "project-use-conan"         : "ON",
+fallback: Final[Dict[str, str]] = {
+    "project_name"              : "MISSING_PROJECT_NAME",
+    "project_build_type"        : "Debug",
+    "project_build_tests"       : "OFF",
+    "project_use_conan"         : "ON",
 }
 
-global_params = {}
-shell_commands = {}
-targets = OrderedDict({})
-
-
-def set_global_params():
-    global global_params
-    global_params = {
-        "project-name"              : os.getenv('PROJECT_NAME'),                                              # Set when container starts
-        "project-build-type"        : os.getenv('PROJECT_BUILD_TYPE'),                                        # Modify as needed
-        "project-build-tests"       : is_on_str(os.getenv('PROJECT_BUILD_TESTS')),                            # Same
-        "project-use-conan"         : is_on_str(os.getenv('PROJECT_USE_CONAN')),
-
-        "base-directory"            : os.getenv('PWD'),
-        "build-directory"           : os.path.join(os.getenv('PWD'), "build"),
-        "source-directory"          : os.path.join(os.getenv('PWD'), "src"),
-        "docs-directory"            : os.path.join(os.getenv('PWD'), "docs"),
-        "third-party-directory"     : os.path.join(os.getenv('PWD'), "third_party"),
-        "tools-directory"           : os.path.join(os.getenv('PWD'), "tools"),
-
-        "conan-profile-file"        : os.path.join("/root", ".conan2", "profiles", "default"),
-        "conan-output-directory"    : os.path.join(os.getenv('PWD'), "build", "conan_deps"),
-        "conan-output-toolchain"    : os.path.join(os.getenv('PWD'), "build", "conan_deps", "conan_toolchain.cmake"),
-
-        "dependency-graph-input"    : os.path.join(os.getenv('PWD'), "build", "dependency_graph", "dependency_graph.dot"),
-        "dependency-graph-output"   : os.path.join(os.getenv('PWD'), "build", "dependency_graph.png"),
-
-        "cmake-cache-file"          : os.path.join(os.getenv('PWD'), "build", "CMakeCache.txt"),
-        "cmake-build-parallel-level": 8,                                                                        # Number of cores -j8
-
-        "cmake-compile-commands"    : os.path.join(os.getenv('PWD'), "build", "compile_commands.json"),
-
-        "binary-app-directory"      : os.path.join(os.getenv('PWD'), "build", "app"),
-        "binary-app-postfix"        : "_run",
-
-        "binary-test-directory"     : os.path.join(os.getenv('PWD'), "build", "test"),
-        "binary-test-postfix"       : "_test_run",
-        
-        "clang-tidy-target-postfix" : "_clangtidy",
-
-        # If a target list is needed, a CMake config is of course a prerequisite. The below actions run a process to extract target names from the CMake cache.
-        "action-requires-targets"   : [
-                                        "build_target_list", 
-                                        "test_target_list", 
-                                        "coverage_target_list",
-                                        "run_coverage", 
-                                        "clang_tidy_target_list",
-                                        "clang_tidy_all",
-                                        "clang_tidy_target",
-                                        "docs_target_list",
-                                        "vscode_tasks"
-                                    ],
-
-        # These actions require a run of the guard/resolution of environment variables and flags/options.
-        "action-triggers-guard"     : [
-                                        "conan_install",            # needs project-build-type
-                                        "configure_project",        # needs all guarded variables
-                                        "vscode_launch",            # needs project name
-                                        "vscode_tasks",             # needs build type and to know about Conan
-                                        "vscode_properties"         # needs everything in order to run reconfiguration
-                                    ],
-
-        # These actions will trigger a new CMake configuration run
-        "action-triggers-config"    : [
-                                        "configure_project",
-                                        "vscode_tasks",             # Needs target names (e.g. to know whether to build a coverage task)
-                                        "vscode_properties"         # Needs to know compiler, paths
-                                    ],
+# If a target list is needed, a CMake config is of course a prerequisite. The below actions run a process to extract target names from the CMake cache.
+actions_requiring_targets: Final[Tuple[str, ...]] = (
+    "build_target_list",
+    "test_target_list",
+    "coverage_target_list",
+    "run_coverage",
+    "clang_tidy_target_list",
+    "clang_tidy_all",
+    "clang_tidy_target",
+    "docs_target_list",
+    "vscode_tasks"
+)
+
+# These actions require a run of the guard/resolution of environment variables and flags/options.
+actions_triggering_guard: Final[Tuple[str, ...]] = (
+    "conan_install",            # needs project_build_type
+    "configure_project",        # needs all guarded variables
+    "vscode_launch",            # needs project name
+    "vscode_tasks",             # needs build type and to know about Conan
+    "vscode_properties"         # needs everything in order to run reconfiguration
+)
+
+# These actions will trigger a new CMake configuration run
+actions_triggering_config: Final[Tuple[str, ...]] = (
+    "configure_project",
+    "vscode_tasks",             # Needs target names (e.g. to know whether to build a coverage task)
+    "vscode_properties"         # Needs to know compiler, paths
+)
+
+# Argv templates for the longer shell commands, each token formatted against the Config when first needed
+conan_install_template: Final     = ("conan", "install", "{config.third_party_dir}",
+                                     "-s", "build_type={config.project_build_type}",
+                                     "--output-folder={config.conan_output_dir}",
+                                     "--build", "missing",
+                                     "-s", f"compiler.cppstd={cppstd}")
+
+cmake_configure_template: Final   = ("cmake", "-S", "{config.base_dir}",
+                                     "-B", "{config.build_dir}",
+                                     "-G", "{config.cmake_generator}",
+                                     "-DCMAKE_BUILD_TYPE={config.project_build_type}",
+                                     "-DBUILD_TESTS={config.project_build_tests}",
+                                     "--graphviz={config.dependency_graph_input}",
+                                     "-DUSE_CONAN={config.project_use_conan}")
+
+cmake_conan_add_template: Final   = ("-DCMAKE_TOOLCHAIN_FILE={config.conan_output_toolchain}",
+                                     "-DCMAKE_POLICY_DEFAULT_CMP0091=NEW")
+
+# Options recognized by the argparse-free scan in parse_args(). Keep in sync with get_parser()
+switch_options: Final = frozenset({
+    "--conan-profile", "--conan-install", "--use-conan",
+    "--configure-project", "--make",
+    "--build-target-list", "--build-run-project", "--debug", "--release",
+    "--with-tests", "--build-test-project", "--test-target-list", "--coverage-target-list", "--run-coverage",
+    "--clean-project",
+    "--clang-tidy-target-list", "--clang-tidy-all", "--clang-format-all",
+    "--docs-target-list", "--docs",
+    "--vscode-launch", "--vscode-tasks", "--vscode-properties",
+})
+
+value_options: Final = {                            # Option and the type of its value
+    "--jobs"                    : positive_int,
+    "--clang-tidy-target"       : str,
+    "--clang-format-target"     : str,
+}
+
+shell_commands: Mapping = {}
+targets = {}
+target_classifier: re.Pattern = None
+known_target_ids: Optional[FrozenSet[str]] = None   # All ids over all target types, None until targets are populated
+targets_cache: Optional[Tuple[int, dict, re.Pattern, FrozenSet[str]]] = None    # Populated targets, by mtime of CMakeCache.txt
+
+
+def get_available_cores() -> int:
+    """ Number of cores this process may run on (respects affinity/cgroup limits where the OS exposes them). """
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 4
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """
+    Parameters of the project for this run. Frozen once loaded and resolved (see load_params() and guard_all_required()).
+    Being immutable (and hashable) it can be passed around and used as a cache key.
+    """
+    project_name: str                   # Set when container starts
+    project_build_type: str             # Modify as needed
+    project_build_tests: str            # Same
+    project_use_conan: str
+
+    base_dir: str
+    build_dir: str
+    source_dir: str
+    docs_dir: str
+    third_party_dir: str
+    tools_dir: str
+
+    conan_output_dir: str
+    conan_output_toolchain: str
+
+    dependency_graph_input: str
+    dependency_graph_output: str
+
+    cmake_cache_file: str
+    cmake_compile_commands: str
+
+    binary_app_dir: str
+    binary_test_dir: str
+
+    # Static parameters: the same for every run (defaults evaluated once, at import), unless overridden by flags
+    conan_profile_file: str             = "/root/.conan2/profiles/default"
+
+    cmake_generator: str                = field(default="Ninja", compare=False)    # --make for "Unix Makefiles". Resolved after construction, so not part of (cache) keys
+    cmake_build_parallel_level: int     = get_available_cores()     # -jN: --jobs N, else $CMAKE_BUILD_PARALLEL_LEVEL, else number of cores
+
+    binary_app_postfix: str             = "_run"
+    binary_test_postfix: str            = "_test_run"
+    clang_tidy_target_postfix: str      = "_clangtidy"
+
+
+def load_params() -> Dict[str, Any]:
+    """
+    Parameters as loaded/inferred from the environment, still open to resolution. Keys are the Config fields.
+    Static parameters are left to the Config defaults (an exported parallel level and flags may still add them here).
+    """
+    pwd = os.environ.get('PWD') or os.getcwd()
+    build_dir = f"{pwd}/build"
+    conan_out = f"{build_dir}/conan_deps"
+    params = {
+        "project_name"              : os.environ.get('PROJECT_NAME'),
+        "project_build_type"        : os.environ.get('PROJECT_BUILD_TYPE'),
+        "project_build_tests"       : is_on_str(os.environ.get('PROJECT_BUILD_TESTS')),
+        "project_use_conan"         : is_on_str(os.environ.get('PROJECT_USE_CONAN')),
+
+        "base_dir"                  : pwd,
+        "build_dir"                 : build_dir,
+        "source_dir"                : f"{pwd}/src",
+        "docs_dir"                  : f"{pwd}/docs",
+        "third_party_dir"           : f"{pwd}/third_party",
+        "tools_dir"                 : f"{pwd}/tools",
+
+        "conan_output_dir"          : conan_out,
+        "conan_output_toolchain"    : f"{conan_out}/conan_toolchain.cmake",
+
+        "dependency_graph_input"    : f"{build_dir}/dependency_graph/dependency_graph.dot",
+        "dependency_graph_output"   : f"{build_dir}/dependency_graph.png",
+
+        "cmake_cache_file"          : f"{build_dir}/CMakeCache.txt",
+        "cmake_compile_commands"    : f"{build_dir}/compile_commands.json",
+
+        "binary_app_dir"            : f"{build_dir}/app",
+        "binary_test_dir"           : f"{build_dir}/test",
     }
 
+    # A parallel level the user already exported applies to all builds (an invalid one is left to the default)
+    try:
+        params['cmake_build_parallel_level'] = positive_int(os.environ['CMAKE_BUILD_PARALLEL_LEVEL'])
+    except (KeyError, ValueError):
+        pass
+
+    return params
+
 
-def set_targets():
-    global targets
-    # Target types and regex to identify it. Targets are parsed in order (e.g. build is the remainder after parsing the others) 
-    targets = OrderedDict({
+def set_targets(config: Config):
+    global targets, target_classifier, known_target_ids
+    known_target_ids = None                 # Stale until targets are allocated again
+    # Target types and regex to identify it (matching the whole target name). Targets are parsed in order (e.g. build is the remainder after parsing the others) 
+    targets = {
                             "coverage"          : {
-                                                    "re"    : "^coverage$",
+                                                    "re"    : re.compile(r"coverage"),
                                                     "ids"   : [],
                                                 },
                             "docs"              : {
-                                                    "re"    : "^docs$",
+                                                    "re"    : re.compile(r"docs"),
                                                     "ids"   : [],
                                                 },
                             "clang-tidy"        : {
-                                                    "re"    : ".*_clangtidy$",
+                                                    "re"    : re.compile(r".*_clangtidy"),
                                                     "ids"   : [],
                                                 },
                             "test"              : {
-                                                    "re"    : ".*_test_run$",
+                                                    "re"    : re.compile(r".*_test_run"),
                                                     "ids"   : [],
                                                 },
                             "install"           : {
-                                                    "re"    : "^install.*",
+                                                    "re"    : re.compile(r"install.*"),
                                                     "ids"   : [],
                                                 },
                             "build"             : {
-                                                    "re"    : f"^{global_params['project-name']}_.*",
+                                                    "re"    : re.compile(f"{re.escape(str(config.project_name))}_.*"),
                                                     "ids"   : [],
                                                 },
-                        })
+                        }
+
+    # All patterns fused (in the same order) into one alternation, where the name of the matching group is the target type.
+    # Used with fullmatch(), so the alternatives need no anchors
+    target_classifier = re.compile("|".join(
+        f"(?P<{to_group_name(target_type)}>{target_type_params['re'].pattern})" for target_type, target_type_params in targets.items()
+    ))
+
+
+def to_group_name(target_type: str) -> str:
+    """ Target type as a valid regex group name (clang-tidy -> clang_tidy). """
+    return target_type.replace('-', '_')
 
 
-def set_shell_commands():
+def format_argv(template: Tuple[str, ...], config: Config) -> List[str]:
+    """ Fill in each token of an argv template from the config. """
+    return [token.format(config=config) for token in template]
+
+
+class _ShellCommands(Mapping):
+    """
+    Read-only mapping of shell commands (as argv lists), each formatted from the config the first time it is requested.
+    Most invocations only use a handful of the commands, so the remaining ones are never built.
+    Entries are shared, so extend them by concatenation (cmd + [...]) rather than in place.
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[], List[str]]]):
+        self._builders = builders
+        self._built: Dict[str, List[str]] = {}
+
+    def __getitem__(self, key: str) -> List[str]:
+        if key not in self._built:
+            self._built[key] = self._builders[key]()
+        return self._built[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._builders)
+
+    def __len__(self) -> int:
+        return len(self._builders)
+
+
+def set_shell_commands(config: Config):
     global shell_commands
-    shell_commands = {
-        "conan-profile-cmd"         : "conan profile detect --force",
-        "conan-install-cmd"         : f"conan install {global_params['third-party-directory']} "
-                                      f"-s build_type={global_params['project-build-type']} "
-                                      f"--output-folder={global_params['conan-output-directory']} "
-                                      f"--build missing "
-                                      f"-s compiler.cppstd={cppstd}",
+    shell_commands = _ShellCommands({
+        "conan-profile-cmd"         : lambda: ["conan", "profile", "detect", "--force"],
+        "conan-install-cmd"         : lambda: format_argv(conan_install_template, config),
 
-        "cmake-configure-cmd"       : f"cmake -S {global_params['base-directory']} "
-                                      f"-B {global_params['build-directory']} "
-                                      f'-G "Unix Makefiles" '
-                                      f"-DCMAKE_BUILD_TYPE={global_params['project-build-type']} "
-                                      f"-DBUILD_TESTS={is_on_str(global_params['project-build-tests'])} "
-                                      f"--graphviz={global_params['dependency-graph-input']} "
-                                      f"-DUSE_CONAN={global_params['project-use-conan']} ",
+        "cmake-configure-cmd"       : lambda: format_argv(cmake_configure_template, config),
 
-        "cmake-conan-add-cmd"       : f"-DCMAKE_TOOLCHAIN_FILE={global_params['conan-output-toolchain']} "
-                                      f"-DCMAKE_POLICY_DEFAULT_CMP0091=NEW",                                # cmake-configure-cmd + cmake-conan-add-cmd
+        "cmake-conan-add-cmd"       : lambda: format_argv(cmake_conan_add_template, config),           # cmake-configure-cmd + cmake-conan-add-cmd
 
-        "cmake-build-target-cmd"    : f"cmake --build {global_params['build-directory']} --target ",        # + <target_name>
+        "cmake-configure-project-cmd": lambda: (shell_commands['cmake-configure-cmd']                   # Full configuration call, with Conan if used
+                                               + (shell_commands['cmake-conan-add-cmd'] if config.project_use_conan == "ON" else [])),
 
-        "cmake-build-default-cmd"   : f"cmake --build {global_params['build-directory']} -j{global_params['cmake-build-parallel-level']} ", # -j N for multicore build
+        "cmake-build-target-cmd"    : lambda: ["cmake", "--build", config.build_dir, "--target"],     # + [<target_name>]
 
-        "cmake-docs-cmd"            : f"cmake --build {global_params['build-directory']} --target docs",
+        "cmake-build-default-cmd"   : lambda: ["cmake", "--build", config.build_dir, f"-j{config.cmake_build_parallel_level}"], # -j N for multicore build
 
-        "execute-app-cmd"           : os.path.join(
-                                        global_params['binary-app-directory'], 
-                                        global_params['project-name'] + global_params['binary-app-postfix']),
+        "cmake-docs-cmd"            : lambda: ["cmake", "--build", config.build_dir, "--target", "docs"],
 
-        "execute-tests-cmd"         : os.path.join(
-                                        global_params['binary-test-directory'], 
-                                        global_params['project-name'] + global_params['binary-test-postfix']),
+        "execute-app-cmd"           : lambda: [f"{config.binary_app_dir}/{config.project_name}{config.binary_app_postfix}"],
 
-        "clean-project-cmd"         : f"rm -rf \"{global_params['build-directory']}/\"* && "
-                                      f"touch \"{os.path.join(global_params['build-directory'],'.gitkeep')}\"",
+        "execute-tests-cmd"         : lambda: [f"{config.binary_test_dir}/{config.project_name}{config.binary_test_postfix}"],
 
-        "dependency-graph-cmd"      : f"dot -Tpng {global_params['dependency-graph-input']} "
-                                      f"-o {global_params['dependency-graph-output']}",
-    }
+        "dependency-graph-cmd"      : lambda: ["dot", "-Tpng", config.dependency_graph_input,
+                                               "-o", config.dependency_graph_output],
+    })
 
 
 def get_parser():
     """ Create and return a commandline parser object. """
+    import argparse         # Only needed for --help and commandlines that scan_args() can't handle
+
     parser = argparse.ArgumentParser(
         description="Development, Test and Tooling Actions. Command-line automation of actions related to CMake, Conan, clang-* tools, etc."
     )
@@ -265,6 +391,10 @@ def get_parser():
                             action='store_true', 
                             help='(Re-)configure entire CMake project. Ex. --configure-project --debug --with-tests --conan-install')
 
+    configopt.add_argument('--make', 
+                            action='store_true', 
+                            help='Configure with the Unix Makefiles generator instead of Ninja. An already configured build dir keeps its generator until --clean-project')
+
     buildopt.add_argument('--build-target-list', 
                             action='store_true',
                             help='List available build targets')
@@ -273,6 +403,11 @@ def get_parser():
                             action='store_true', 
                             help='(Re-)build project from current configuration, then run app')
     
+    buildopt.add_argument('--jobs', 
+                            metavar='<N>',
+                            type=positive_int,
+                            help='Number of parallel build jobs (default: number of available cores)')
+
     buildopt.add_argument('--debug', 
                             action='store_true', 
                             help='Force debug build')
@@ -346,7 +481,60 @@ def get_parser():
     return parser
 
 
-def guard_all_required(args):
+def to_dest(option: str) -> str:
+    """ Attribute name of an option in the parsed args, as argparse names it (--clang-tidy-all -> clang_tidy_all). """
+    return option[2:].replace('-', '_')
+
+
+def scan_args(argv: List[str]) -> Optional[SimpleNamespace]:
+    """
+    Parse a commandline that only uses the exact (long) options, without building the argparse parser.
+    Returns None for anything else (--help, abbreviations, unknown options, missing or bad values).
+    """
+    values = {to_dest(option): False for option in switch_options}
+    values.update({to_dest(option): None for option in value_options})
+
+    tokens = iter(argv)
+    for token in tokens:
+        option, has_value, value = token.partition('=')
+
+        if option in switch_options and not has_value:
+            values[to_dest(option)] = True
+
+        elif option in value_options:
+            if not has_value:
+                value = next(tokens, None)
+            if value is None or value.startswith('-'):
+                return None
+            try:
+                values[to_dest(option)] = value_options[option](value)
+            except ValueError:
+                return None
+
+        else:
+            return None
+
+    return SimpleNamespace(**values)
+
+
+def parse_args(argv: List[str]):
+    """ Parse the commandline, leaving to argparse only what the plain scan can't handle (help texts and errors). """
+    args = scan_args(argv)
+    if args is None:
+        args = get_parser().parse_args(argv)
+    return args
+
+
+def override_from_flags(args, params: Dict[str, Any]):
+    """ Set the parameters that are controlled directly by a flag/option (no environment variable involved). """
+    if args.make:
+        params['cmake_generator'] = "Unix Makefiles"
+
+    if args.jobs is not None:
+        params['cmake_build_parallel_level'] = args.jobs
+
+
+def guard_all_required(args, params: Dict[str, Any]):
     """
     Always run this for options that trigger reconfiguration, in order to ensure that needed parameters and env are set.
     This step (possibly) sets environment variables for child processes. Will not change the parent/calling environment.
@@ -354,34 +542,33 @@ def guard_all_required(args):
     """
     print("Resolving required parameters... These may be different from the current CMake configuration.")
 
-    # Curry the function with the globals from this file
-    guard = partial(guard_single, global_params=global_params, fallback=fallback)
+    # Curry the function with the parameters being resolved and the fallbacks from this file
+    guard = partial(guard_single, params=params, fallback=fallback)
 
     # PROJECT_NAME: Project name doesn't have any possible --options
-    guard(env_var='PROJECT_NAME', param_name='project-name')
+    guard(env_var='PROJECT_NAME', param_name='project_name')
 
     # PROJECT_BUILD_TYPE: potentially via --debug or --release
     # Only override if more than zero of the flags are set
-    override_build_type = any([args.debug, args.release])    
-    if all([args.debug, args.release]) or not any([args.debug, args.release]) or args.debug:
-        # User specified neither flag or both flags (XOR: Either both on or both off), or --debug.
-        override_type = "Debug"
-    else:
-        # Must be --release
+    override_build_type = args.debug or args.release
+    if args.release and not args.debug:
         override_type = "Release"
+    else:
+        # User specified neither flag, both flags, or --debug.
+        override_type = "Debug"
 
-    guard(env_var='PROJECT_BUILD_TYPE',  param_name='project-build-type',  override_with_flag=override_build_type, override_value=override_type)
+    guard(env_var='PROJECT_BUILD_TYPE',  param_name='project_build_type',  override_with_flag=override_build_type, override_value=override_type)
 
     # PROJECT_BUILD_TESTS: If invoking --build-test-project or --with-tests, then we want to enable tests in the build
-    override_testing = any([args.build_test_project, args.with_tests]) 
-    guard(env_var='PROJECT_BUILD_TESTS', param_name='project-build-tests', override_with_flag=override_testing, override_value="ON")
+    override_testing = args.build_test_project or args.with_tests
+    guard(env_var='PROJECT_BUILD_TESTS', param_name='project_build_tests', override_with_flag=override_testing, override_value="ON")
 
     # PROJECT_USE_CONAN If invoking --conan-install or --use-conan (i.e., conan deps must be installed separately), then Conan is inferred
-    override_conan = any([args.conan_install, args.use_conan])
-    guard(env_var='PROJECT_USE_CONAN', param_name='project-use-conan', override_with_flag=override_conan, override_value="ON")
+    override_conan = args.conan_install or args.use_conan
+    guard(env_var='PROJECT_USE_CONAN', param_name='project_use_conan', override_with_flag=override_conan, override_value="ON")
 
 
-def handle_args(args):
+def handle_args(args, config: Config):
     """ 
     Handle commandline arguments: Non-mutually exclusive handling.
     The order is important:
@@ -392,71 +579,72 @@ def handle_args(args):
     """
 
     # *** Get some target info first, if needed ***
-    if is_requires_targets(args) and is_project_configured():
-        populate_targets()
+    if is_requires_targets(args) and is_project_configured(config):
+        populate_targets(config)
 
-    elif is_requires_targets(args) and not is_project_configured():
+    elif is_requires_targets(args) and not is_project_configured(config):
         print("Project not configured. Run --configure-project first, then any of the --*-list")
 
 
     # *** Conan ***
     if (args.conan_profile):
-        os.system(shell_commands['conan-profile-cmd'])
+        run_command(shell_commands['conan-profile-cmd'])
+        is_conan_configured.cache_clear()
 
     if (args.conan_install):
-        if not is_conan_configured():
+        if not is_conan_configured(config):
             # Run config for conan first to avoid fail
-            os.system(shell_commands['conan-profile-cmd'])
-        os.system(shell_commands['conan-install-cmd'])
+            run_command(shell_commands['conan-profile-cmd'])
+            is_conan_configured.cache_clear()
+        run_command(shell_commands['conan-install-cmd'])
 
 
     # *** Configure without building ***
     if (is_triggers_config(args)):
 
-        cmd: str = shell_commands['cmake-configure-cmd'] 
-        if global_params['project-use-conan'] == "ON":
-            cmd += shell_commands['cmake-conan-add-cmd']
-        
-        print(f"CMake configuration call: {cmd}")
-        os.system(cmd)
+        cmd: List[str] = shell_commands['cmake-configure-project-cmd']
+        print(f"CMake configuration call: {shlex.join(cmd)}")
+        run_command(cmd)
+        is_project_configured.cache_clear()                 # Cache file (likely) exists now, with new contents
+        get_cmake_cache.cache_clear()
 
 
     # *** Output for *-list ***
     # TODO: Refactor header into global object
-    if args.build_target_list and is_project_configured():
+    if args.build_target_list and is_project_configured(config):
         pretty_print_targets(target_type='build', header="Build targets:")
 
-    if args.test_target_list and is_project_configured():
+    if args.test_target_list and is_project_configured(config):
         pretty_print_targets(target_type='test', header="Test targets:")
 
-    if args.coverage_target_list and is_project_configured():
+    if args.coverage_target_list and is_project_configured(config):
         pretty_print_targets(target_type='coverage', header="Coverage targets:")
 
-    if args.clang_tidy_target_list and is_project_configured():
+    if args.clang_tidy_target_list and is_project_configured(config):
         pretty_print_targets(target_type='clang-tidy', header="Clang-tidy targets:")
 
-    if args.docs_target_list and is_project_configured():
+    if args.docs_target_list and is_project_configured(config):
         pretty_print_targets(target_type='docs', header="Docs targets:")
 
 
     # *** Build targets ***
-    if args.build_run_project and is_project_configured():
-        os.system(shell_commands['cmake-build-default-cmd'])
-        os.system(shell_commands['execute-app-cmd'])
+    if args.build_run_project and is_project_configured(config):
+        run_command(shell_commands['cmake-build-default-cmd'])
+        run_command(shell_commands['execute-app-cmd'])
 
-    elif args.build_run_project and not is_project_configured():
+    elif args.build_run_project and not is_project_configured(config):
         print("Project not configured. Run --configure-project first, then --build-run")
 
 
     # *** Testing ***
     if (args.build_test_project):
-        os.system(shell_commands['cmake-build-default-cmd'])
-        os.system(shell_commands['execute-tests-cmd'])
+        run_command(shell_commands['cmake-build-default-cmd'])
+        run_command(shell_commands['execute-tests-cmd'])
 
     if (args.run_coverage):
         # Verify that a "coverage" target exists... For now, obly expecting one cov target.
         # As this may be run together with the build step, re-populate targets
-        populate_targets()
+        populate_targets(config)
 
         if not is_known_target_of_type(target_type="coverage", target_id="coverage"):
             print("Project not configured for coverage. Check ENABLE_COVERAGE in CMakeLists.txt and further settings in test/CMakeLists.txt")
@@ -467,9 +655,8 @@ def handle_args(args):
 
     # *** Clang-tidy runs ***
     if (args.clang_tidy_all):
-        for t in get_known_targets_of_type('clang-tidy'):
-            # Execute clang-tidy one by one
-            run_single_target(t)
+        # Execute all clang-tidy targets in one CMake run (each one already runs clang-tidy in parallel over its files)
+        run_targets(get_known_targets_of_type('clang-tidy'))
 
     if (args.clang_tidy_target):
         # Check if the requested target is indeed a possible target
@@ -480,29 +667,27 @@ def handle_args(args):
             run_single_target(args.clang_tidy_target)
 
     if (args.docs):
-        os.system(shell_commands['cmake-docs-cmd'])
+        run_command(shell_commands['cmake-docs-cmd'])
 
     if (args.clean_project):
-        os.system(shell_commands['clean-project-cmd'])
+        clean_project(config)
 
     # *** VSCode config runs ***
-    if (args.vscode_launch):
-        launch_json = make_vscode_launch_json()
-        print("Copy to ../.vscode/launch.json:")
-        print(launch_json)
+    # Each configuration is built right before it is printed, so any notices stay next to their section
+    vscode_configs = [
+        (args.vscode_launch,        make_vscode_launch_dict,        "../.vscode/launch.json"),
+        (args.vscode_tasks,         make_vscode_tasks_dict,         "../.vscode/tasks.json"),
+        (args.vscode_properties,    make_vscode_properties_dict,    "../.vscode/c_cpp_properties.json"),
+    ]
 
-    if (args.vscode_tasks):
-        tasks_json = make_vscode_tasks_json()
-        print("Copy to ../.vscode/tasks.json:")
-        print(tasks_json)
+    for requested, make_dict, filename in vscode_configs:
+        if requested:
+            vscode_dict = make_dict(config)
+            print(f"Copy to {filename}:")
+            print_json(vscode_dict)
 
-    if (args.vscode_properties):
-        properties_json = make_vscode_properties_json()
-        print("Copy to ../.vscode/c_cpp_properties.json:")
-        print(properties_json)
 
-
-def make_vscode_launch_dict() -> VSCodeLaunch:
+def make_vscode_launch_dict(config: Config) -> VSCodeLaunch:
     """
     Creates Dictionary object parsable as launch.json by VSCode.
     """
@@ -510,11 +695,11 @@ def make_vscode_launch_dict() -> VSCodeLaunch:
         'version': '0.2.0',
         'configurations': [
             {
-                'name': f"~> {global_params['project-name']} debug",
+                'name': f"~> {config.project_name} debug",
                 'cwd': '${workspaceFolder}',
                 'type': 'cppdbg',
                 'request': 'launch',
-                'program': shell_commands['execute-app-cmd'],
+                'program': shell_commands['execute-app-cmd'][0],
                 'stopAtEntry': True,
                 'environment': [],
                 'externalConsole': False,
@@ -526,7 +711,7 @@ def make_vscode_launch_dict() -> VSCodeLaunch:
                         'ignoreFailures': True
                     }
                 ],
-                'preLaunchTask': f"~> Build {global_params['project-name']}",              # References the task with this name
+                'preLaunchTask': f"~> Build {config.project_name}",              # References the task with this name
                 'miDebuggerPath': '/usr/bin/gdb'
             }
         ]
@@ -535,27 +720,21 @@ def make_vscode_launch_dict() -> VSCodeLaunch:
     return launch
 
 
-def make_vscode_launch_json():
-    return json.dumps(make_vscode_launch_dict(), indent=4)
-
-
-def make_vscode_tasks_dict() -> VSCodeTasks:
+def make_vscode_tasks_dict(config: Config) -> VSCodeTasks:
     """
     Creates Dictionary object parsable as tasks.json by VSCode.
     """
-    config_cmd: str = shell_commands['cmake-configure-cmd'] + shell_commands['cmake-conan-add-cmd']
-    config_cmd_args = config_cmd.split(' ')
+    config_cmd_args: List[str] = shell_commands['cmake-configure-project-cmd']
 
-    build_cmd: str = shell_commands['cmake-build-default-cmd']
-    build_cmd_args = build_cmd.split(' ')
+    build_cmd_args: List[str] = shell_commands['cmake-build-default-cmd']
 
     options_obj: VSCodeTaskOption = {
-        'cwd': global_params['build-directory']
+        'cwd': config.build_dir
     }
 
     configure_debug_build_task: VSCodeTask = {
         'type': 'shell',
-        'label': f"~> Configure {global_params['project-name']} with debug symbols",
+        'label': f"~> Configure {config.project_name} with debug symbols",
         'detail': 'Invoke CMake to configure project, required to build it at a later stage.',
         'command': '/usr/bin/cmake',
         'args': config_cmd_args[1:],                    # exclude cmake
@@ -564,7 +743,7 @@ def make_vscode_tasks_dict() -> VSCodeTasks:
 
     make_debug_build_task: VSCodeTask = {
         'type': 'shell',
-        'label': f"~> Build {global_params['project-name']}",
+        'label': f"~> Build {config.project_name}",
         'detail': 'Invoke CMake to build project now.',
         'command': '/usr/bin/cmake',
         'args': build_cmd_args[1:],                     # exclude cmake
@@ -578,9 +757,9 @@ def make_vscode_tasks_dict() -> VSCodeTasks:
 
     run_test_task: VSCodeTask = {
         'type': 'shell',
-        'label': f"~> Run tests for {global_params['project-name']}",
+        'label': f"~> Run tests for {config.project_name}",
         'detail': 'Run all unit tests now.',
-        'command': shell_commands['execute-tests-cmd'],
+        'command': shell_commands['execute-tests-cmd'][0],
         'args': [],
         'options': options_obj,
         'dependsOn': [make_debug_build_task['label']]
@@ -588,13 +767,12 @@ def make_vscode_tasks_dict() -> VSCodeTasks:
 
     # Only make coverage task if coverage is set up as a target in CMakeLists.txt (or --use-coverage)
     if use_coverage := is_known_target_of_type(target_type="coverage", target_id="coverage"):
-        # cmake --build {global_params['build-directory']} --target coverage
-        coverage_cmd: str = shell_commands['cmake-build-target-cmd'] + "coverage"
-        coverage_cmd_args = coverage_cmd.split(' ')
+        # cmake --build {config.build_dir} --target coverage
+        coverage_cmd_args: List[str] = shell_commands['cmake-build-target-cmd'] + ["coverage"]
 
         run_coverage_task: VSCodeTask = {
             'type': 'shell',
-            'label': f"~> Run code coverage for {global_params['project-name']}",
+            'label': f"~> Run code coverage for {config.project_name}",
             'detail': 'Analyze code coverage.',
             'command': '/usr/bin/cmake',
             'args': coverage_cmd_args[1:],
@@ -612,17 +790,14 @@ def make_vscode_tasks_dict() -> VSCodeTasks:
 
     return tasks
 
-def make_vscode_tasks_json():
-    return json.dumps(make_vscode_tasks_dict(), indent=4)
 
-
-def make_vscode_properties_dict() -> VSCodeProperties:
+def make_vscode_properties_dict(config: Config) -> VSCodeProperties:
     """
     Creates Dictionary object parsable as c_cpp_properties.json by VSCode.
     """
 
-    cc = CMakeCache(global_params['cmake-cache-file'])      # Load CMakeCache.txt
-    conan_include_paths = get_conan_include_paths(global_params['conan-output-toolchain'])
+    cc = get_cmake_cache(config)                                  # Load CMakeCache.txt
+    conan_include_paths = get_conan_include_paths(config.conan_output_toolchain)
 
     properties: VSCodeProperties = {
         'version': 4,
@@ -632,38 +807,74 @@ def make_vscode_properties_dict() -> VSCodeProperties:
                 'includePath': [
                     "${workspaceFolder}/**",
                     *conan_include_paths,
-                    os.path.join(global_params['build-directory'], 'config', 'include'),
-                    os.path.join(global_params['source-directory'], 'include')
+                    f"{config.build_dir}/config/include",
+                    f"{config.source_dir}/include"
                 ],
                 'defines': [],
                 'compilerPath': cc['CMAKE_CXX_COMPILER'],
                 'cStandard': 'c17',
                 'cppStandard': f"c++{cppstd}",
                 'intelliSenseMode': 'linux-gcc-x64',
-                'compileCommands': global_params['cmake-compile-commands']
+                'compileCommands': config.cmake_compile_commands
             }
         ]       
     }
     return properties
 
 
-def make_vscode_properties_json():
-    return json.dumps(make_vscode_properties_dict(), indent=4)
+def resolve_cmake_generator(config: Config) -> Config:
+    """
+    Config with the generator CMake can actually configure with.
+    An existing build dir keeps the generator it was configured with (CMake refuses to switch it),
+    and Ninja falls back to Unix Makefiles if ninja isn't installed.
+    """
+    # The generator this host can give: Ninja only if ninja is installed
+    generator = config.cmake_generator
+    fell_back = generator == "Ninja" and shutil.which("ninja") is None
+    if fell_back:
+        generator = "Unix Makefiles"
+
+    if is_project_configured(config):
+        try:
+            configured_generator = get_cmake_cache(config)['CMAKE_GENERATOR']
+        except KeyError:
+            configured_generator = generator                # Unknown, so assume it matches
+        if configured_generator != generator:
+            print(f"Build directory is configured with {configured_generator}. Run --clean-project first to switch to {generator}.")
+        generator = configured_generator
+
+    elif fell_back:
+        print("ninja not found, so configuring with Unix Makefiles.")
+
+    return replace(config, cmake_generator=generator)
 
 
-def is_project_configured() -> bool:
+@lru_cache(maxsize=1)
+def is_project_configured(config: Config) -> bool:
     """
     Check if CMake has already configured project (though project may be stale).
     Existence of cache file is proof of configuration.
+    Cached for the run: call is_project_configured.cache_clear() after actions that create/delete the cache file.
     """
-    return bool(os.path.isfile(global_params['cmake-cache-file']))
+    return os.access(config.cmake_cache_file, os.F_OK)
 
 
-def is_conan_configured() -> bool:
+@cache
+def get_cmake_cache(config: Config) -> CMakeCache:
+    """
+    The parsed CMakeCache.txt, read only once per run whatever the number of users.
+    Call get_cmake_cache.cache_clear() after actions that rewrite/delete the cache file.
+    """
+    return CMakeCache(config.cmake_cache_file)
+
+
+@lru_cache(maxsize=1)
+def is_conan_configured(config: Config) -> bool:
     """
     Check if Conan has a default profile.
+    Cached for the run: call is_conan_configured.cache_clear() after detecting a profile.
     """
-    return bool(os.path.isfile(global_params['conan-profile-file']))
+    return os.access(config.conan_profile_file, os.F_OK)
 
 
 def is_any_from_group_set(args, in_group_list: List[str]) -> bool:
@@ -677,17 +888,17 @@ def is_any_from_group_set(args, in_group_list: List[str]) -> bool:
 
 def is_requires_targets(args) -> bool:
     """ Return true if any options have been set that will require CMake cache in order to be aware of target names (i.e. project already configured). """
-    return is_any_from_group_set(args, global_params['action-requires-targets'])
+    return is_any_from_group_set(args, actions_requiring_targets)
 
 
 def is_triggers_guard(args) -> bool:
     """ Return true if any options have been set that must trigger a run of the guard/resolution. """
-    return is_any_from_group_set(args, global_params['action-triggers-guard'])
+    return is_any_from_group_set(args, actions_triggering_guard)
 
 
 def is_triggers_config(args) -> bool:
     """ Return true if any options have been set that must trigger a CMake config. run. """
-    return is_any_from_group_set(args, global_params['action-triggers-config'])
+    return is_any_from_group_set(args, actions_triggering_config)
 
 
 def get_cmake_target_list():
@@ -700,19 +911,13 @@ def get_cmake_target_list():
     this call will print 'Error: could not load cache' twice.
     """
 
-    cmd_string = shell_commands['cmake-build-target-cmd'] + "help"      # <cmake bla bla> --target help
-    cmd_list = list(cmd_string.split(' '))                              # subprocess.run() takes command as a list of component parts
-
-    # Run command and extract output as a list of lines
-    targets_raw = subprocess.run(cmd_list, stdout=subprocess.PIPE).stdout.decode('UTF-8').split(os.linesep)
+    cmd_list = [*shell_commands['cmake-build-target-cmd'], "help"]      # <cmake bla bla> --target help
 
-    # Filter list to only get lines that are targets (Follows pattern '... <target_name>')
-    is_target_filter = lambda line: True if line[:3] == '...' else False
-    
-    # Then Map transforms each remaining line by removing the '... ' prefix
-    remove_dots_map = lambda line: line[4:]
+    # Run command and extract output (decoded by subprocess); a failing help query just gives fewer lines
+    targets_raw = subprocess.run(cmd_list, stdout=subprocess.PIPE, text=True, check=False).stdout
 
-    return list(map(remove_dots_map, filter(is_target_filter, targets_raw)))
+    # Single pass: keep only lines that are targets (Follows pattern '... <target_name>') and remove the '... ' prefix
+    return [line[4:] for line in targets_raw.splitlines() if line.startswith('... ')]
 
 
 def allocate_to_target_types(full_target_list: List[str]) -> None:
@@ -721,25 +926,40 @@ def allocate_to_target_types(full_target_list: List[str]) -> None:
     Types defined per ordered pattern matching (parsing) vs. global object regex. 
     Writes directly to the global targets obj.
     """
-    cmake_target_list: List[str] = full_target_list.copy()
+    target_type_by_group = {to_group_name(target_type): target_type for target_type in targets.keys()}
 
-    # Iterate over raw list of CMake targets to tie each to a recognized target type
-    while (cmake_target_list):
-        cmake_target_id = cmake_target_list.pop()
+    # Iterate over raw list of CMake targets (read only, in CMake's order) to tie each to a recognized target type
+    for cmake_target_id in full_target_list:
 
-        # Ordered/prioritized parsing for each target-type
-        for target_type_params in targets.values():
+        # Ordered/prioritized parsing: the first target-type pattern to match in the fused regex wins
+        if target_match := target_classifier.fullmatch(cmake_target_id):
+            target_type = target_type_by_group[target_match.lastgroup]
+            targets[target_type]['ids'].append(cmake_target_id)        # Store this cmake target as a recognized type
 
-            # Check if cmake_target_id matches the regex for this target-type
-            if re.search(target_type_params['re'], cmake_target_id):
-                target_type_params['ids'].append(cmake_target_id)      # Store this cmake target as a recognized type
-                break                                                  # Done, succesfully assigned the id to a known type
 
+def populate_targets(config: Config) -> None:
+    """
+    Updates the global targets dictionary.
+    Querying CMake costs a subprocess, so the result is reused for as long as CMakeCache.txt is unchanged (same mtime).
+    """
+    global targets, target_classifier, known_target_ids, targets_cache
+
+    try:
+        cache_mtime = os.stat(config.cmake_cache_file).st_mtime_ns
+    except FileNotFoundError:
+        cache_mtime = None                                  # Nothing to key on, so always query
 
-def populate_targets() -> None:
-    """ Updates the global targets dictionary """
-    set_targets()                                       # Reset to default
+    if cache_mtime is not None and targets_cache is not None and targets_cache[0] == cache_mtime:
+        _, cached_targets, target_classifier, known_target_ids = targets_cache
+        targets = deepcopy(cached_targets)                  # Callers may modify the lists
+        return
+
+    set_targets(config)                                       # Reset to default
     allocate_to_target_types(get_cmake_target_list())   # Load from CMake
+    known_target_ids = frozenset(target_id for target_type_params in targets.values() for target_id in target_type_params['ids'])
+
+    if cache_mtime is not None:
+        targets_cache = (cache_mtime, deepcopy(targets), target_classifier, known_target_ids)
 
 
 def get_known_targets_of_type(target_type: str) -> List[str]:
@@ -753,51 +973,110 @@ def is_known_target_of_type(target_type: str, target_id: str) -> bool:
 
 
 def is_known_target(target_id: str) -> bool:
-    """ Checks if target_id can be found in list composed from targets of known types. """
-    all_targets = []
-    for target_type in targets.keys():
-        all_targets += get_known_targets_of_type(target_type)
-    return target_id in all_targets
+    """ Checks if target_id can be found among the targets of known types. """
+    return known_target_ids is not None and target_id in known_target_ids
 
 
 def pretty_print_targets(target_type: str, header: str = "Targets:") -> None:
     """ Prints a list with N items as N lines. """
-    print(header)
-    [print(t) for t in get_known_targets_of_type(target_type)]
+    target_ids = get_known_targets_of_type(target_type)
+    sys.stdout.write(header + "\n" + "".join(f"{target_id}\n" for target_id in target_ids))   # One write for all lines
 
 
 def run_single_target(target_id: str) -> Union[bool, int]:
     """ Order CMake to run/build a single target process declared as <target_name>. """
+    return run_targets([target_id])
+
 
-    # Don't try to execute if target name isn't known to CMake
-    if not is_known_target(target_id):
+def run_targets(target_ids: List[str]) -> Union[bool, int]:
+    """
+    Order CMake to run/build several targets in one invocation (--target takes a list since CMake 3.15),
+    so CMake starts once and the build tool schedules the targets.
+    """
+
+    # Nothing to build (e.g. no clang-tidy targets in the project)
+    if not target_ids:
+        return 0
+
+    # Don't try to execute if a target name isn't known to CMake
+    if not all(map(is_known_target, target_ids)):
         print("Target not in CMake cache. Check <target_name> or reconfigure CMake project.")
         return False
 
-    cmd = shell_commands['cmake-build-target-cmd'] + target_id      # cmake --build <dir> --target <target_id>
-    return os.system(cmd)
+    cmd = [*shell_commands['cmake-build-target-cmd'], *target_ids]  # cmake --build <dir> --target <target_id> ...
+    return run_command(cmd).returncode
+
+
+def run_command(cmd: List[str], **kwargs) -> subprocess.CompletedProcess:
+    """
+    Run an argv command without a shell (keyword arguments go to subprocess.run).
+    As with the shell, a missing executable is reported with exit code 127 instead of raising.
+    """
+    try:
+        return subprocess.run(cmd, check=False, **kwargs)
+    except FileNotFoundError:
+        print(f"{cmd[0]}: command not found", file=sys.stderr)
+        return subprocess.CompletedProcess(cmd, 127)
+
+
+def clean_project(config: Config) -> None:
+    """
+    Delete all build files, leaving an empty build directory with its .gitkeep.
+    Like rm -rf build/*, the entries inside the build directory are deleted, so a symlinked/mounted build dir is cleaned too.
+    Whatever can't be deleted is reported, and the rest is still deleted.
+    """
+    build_dir = config.build_dir
+
+    def report_error(function, path, excinfo):
+        print(f"Could not delete {path}: {excinfo[1]}", file=sys.stderr)
+
+    os.makedirs(build_dir, exist_ok=True)
+    with os.scandir(build_dir) as scan:
+        entries = list(scan)                                # Don't delete while scanning
+
+    for entry in entries:
+        if entry.name == '.gitkeep':
+            continue
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path, onerror=report_error)
+            else:
+                os.unlink(entry.path)                       # Files and symlinks (never their targets)
+        except OSError:
+            report_error(os.unlink, entry.path, sys.exc_info())
+
+    Path(build_dir, '.gitkeep').touch()
+    is_project_configured.cache_clear()
+    get_cmake_cache.cache_clear()
 
 
 def run():
     """ Execute all command line actions """
 
     # Parse commandline
-    p = get_parser()
-    args = p.parse_args()
+    args = parse_args(sys.argv[1:])
 
     # Initialize parameters
-    set_global_params()
+    params = load_params()
+    override_from_flags(args, params)
 
     # Guard and resolve parameters
     if is_triggers_guard(args):
-        guard_all_required(args)
+        guard_all_required(args, params)
+
+    # Parameters are final from here on
+    config = Config(**params)
+    if is_triggers_config(args):
+        config = resolve_cmake_generator(config)
+
+    # Every cmake --build child process (targets, docs, coverage) honors the same parallel level as the default build
+    os.environ['CMAKE_BUILD_PARALLEL_LEVEL'] = str(config.cmake_build_parallel_level)
 
-    # Compute from global parameters
-    # set_targets()
-    set_shell_commands()
+    # Compute from configuration
+    set_shell_commands(config)
 
     # Execute orders
-    handle_args(args)
+    handle_args(args, config)
 
 
 if __name__ == '__main__':
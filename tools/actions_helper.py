@@ -3,9 +3,13 @@ Various helpers for the actions.py script
 Janus, 2023
 """
 
+import json
 import os
+import sys
 from typing import Dict, List, Optional, TypedDict
 
+on_values = frozenset({"true", "TRUE", "True", "on", "ON", "On"})      # Strings accepted as "ON" by is_on_str
+
 class VSCodeLaunchSetupCommand(TypedDict):
     """Defines the object(s) that go into the configurations[setupCommands] sublist in a launch.json file."""
     description: str
@@ -83,18 +87,33 @@ class VSCodeProperties(TypedDict):
     configurations: List[VSCodePropertyConfiguration]
 
 
+def print_json(obj) -> None:
+    """
+    Write obj as JSON to stdout, streamed rather than first built as one string.
+    Always indented by 4, the same as the committed .vscode/*.json files.
+    """
+    json.dump(obj, sys.stdout, indent=4)
+    sys.stdout.write("\n")
+
+
 def is_on_str(text: str) -> str:
     """ "ON" if string is some "true", "TRUE", "True", "on", "ON", "On". Otherwise "OFF" """
-    if text is None:
-        return "OFF"
-    return "ON" if text.upper() in ["TRUE", "ON"] else "OFF"
+    return "ON" if text in on_values else "OFF"
+
+
+def positive_int(text: str) -> int:
+    """ Integer value of an option that must be at least 1 (e.g. a number of jobs). Raises ValueError otherwise. """
+    value = int(text)
+    if value < 1:
+        raise ValueError(f"{value} is not a positive integer")
+    return value
 
 
-def guard_single(global_params, fallback, env_var: str, param_name: str, override_with_flag: bool = False, override_value: str = None, verbose: bool = True):
+def guard_single(params, fallback, env_var: str, param_name: str, override_with_flag: bool = False, override_value: str = None, verbose: bool = True):
     """
     Check that env_var has a valid value. 
-    If not, set it to the global fallback value, and keep global_params sync'ed.
-    Key name in global_params and fallback dicts must match.
+    If not, set it to the global fallback value, and keep params sync'ed.
+    Key name in params and fallback dicts must match.
     Verbose: print what is being done. 
     """
     
@@ -105,15 +124,15 @@ def guard_single(global_params, fallback, env_var: str, param_name: str, overrid
     if override_with_flag:
 
         # Override and sync
-        global_params[param_name]   = override_value
+        params[param_name]          = override_value
         os.environ[env_var]         = override_value
 
     # Elif missing (None) or empty ("")
     elif not os.getenv(env_var):
 
         # Fix and sync
-        global_params[param_name]   = fallback[param_name]
+        params[param_name]          = fallback[param_name]
         os.environ[env_var]         = fallback[param_name]
         
     if verbose:
-        print(f"Using value {os.environ[env_var]} for ENV:{env_var} (was {old_value}) and global_params['{param_name}'].")
+        print(f"Using value {os.environ[env_var]} for ENV:{env_var} (was {old_value}) and params['{param_name}'].")
@@ -7,67 +7,46 @@ import os
 import re
 from typing import Dict
 
-whitespace = re.compile(r"\s")                                          # Matches all whitespace characters
 comment = re.compile(r"#|//")                                           # Comment lines start with # or //
 key_type_value = re.compile(r"(\w+)(-ADVANCED)?:(\w+)=(.*)")            # Splits into three groups (with optional -ADVANCED), e.g. used on CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++
 
 
-class CacheEntry:
-    """
-    Transforms a raw line from CMakeCache into a parsed entry.
-    
-    Example of a raw CMakeCache.txt line
-    //CXX compiler
-    CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++
-    """
-
-    _key: str = ""     # CMAKE_CXX_COMPILER
-    _type: str = ""     # FILEPATH
-    _value: str = ""    # /usr/bin/c++
-
-    def __init__(self, raw_line: str):
-        optional_advanced: str = None
-        _, self._key, optional_advanced, self._type, self._value, _ = key_type_value.split(raw_line)     # "CMAKE_CXX_COMPILER", "FILEPATH", "/usr/bin/c++""
-        if (optional_advanced):
-            self._key += "_ADVANCED"
-    
-    @property
-    def key(self) -> str:
-        return self._key
-    
-    @property
-    def type(self) -> str:
-        return self._type
-    
-    @property
-    def value(self) -> str:
-        return self._value
-
-
 class CMakeCache:
     """
     Parses a CMakeCache.txt file into Dictionary of key-value pairs.
     Comment lines are ignored (no semantic value).
+
+    Example of a raw CMakeCache.txt line, stored as "CMAKE_CXX_COMPILER": "/usr/bin/c++"
+    //CXX compiler
+    CMAKE_CXX_COMPILER:FILEPATH=/usr/bin/c++
     """
 
-    _entries: Dict[str, str] = {}
+    _entries: Dict[str, str]
 
     def __init__(self, cmake_cache_filename: str):
 
+        self._entries = {}                          # Per instance, so separate reads never share entries
+
         print(f"Reading {cmake_cache_filename}.")
 
         if not bool(os.path.isfile(cmake_cache_filename)):
             raise FileNotFoundError
         
         with open(cmake_cache_filename, "r") as file:
-            while(line := file.readline()):
-                line = whitespace.sub("", line)
-                if len(line)==0 or comment.match(line):
-                    continue                        # Skip blank lines and comments
-                
-                # Process and store the entry
-                entry = CacheEntry(line)
-                self._entries[entry.key] = entry.value
+            lines = file.read().splitlines()        # File is small, so read it in one go
+
+        for line in lines:
+            line = line.strip()
+            if len(line)==0 or comment.match(line):
+                continue                            # Skip blank lines and comments
+            
+            # Process and store the entry, e.g. "CMAKE_CXX_COMPILER", None, "FILEPATH", "/usr/bin/c++"
+            if not (entry := key_type_value.fullmatch(line)):
+                continue                            # Skip lines that are not entries
+            key, optional_advanced, _, value = entry.groups()
+            if optional_advanced:
+                key += "_ADVANCED"
+            self._entries[key] = value
                 
     def __getitem__(self, key):
         return self._entries[key]
@@ -10,22 +10,32 @@ Janus, June 2023.
 
 import os
 import re
+from functools import lru_cache
 from typing import List
 
-include_paths_pattern = re.compile(r"list\(PREPEND\sCMAKE_INCLUDE_PATH\s(\".*\")")
+include_paths_prefix = "list(PREPEND CMAKE_INCLUDE_PATH "                                      # Literal prefix to find the line
+include_paths_pattern = re.compile(r"list\(PREPEND\sCMAKE_INCLUDE_PATH\s(\".*\")", re.ASCII)   # Extracts the quoted paths from it
 
 
 def get_conan_include_paths(cmake_toolchain_filepath: str) -> List[str]:
     """Fetch line from cmake_toolchain.cmake file and return list of include paths."""
     if not os.path.isfile(cmake_toolchain_filepath):
         raise FileNotFoundError(f"File not found {cmake_toolchain_filepath}.")
-    
+
+    # The modification time is part of the cache key, so a regenerated toolchain file is parsed again
+    return list(_read_conan_include_paths(cmake_toolchain_filepath, os.stat(cmake_toolchain_filepath).st_mtime_ns))
+
+
+@lru_cache(maxsize=4)
+def _read_conan_include_paths(cmake_toolchain_filepath: str, mtime_ns: int) -> List[str]:
+    """Parse the include paths from the file (as of mtime_ns). Results are shared, so don't modify them."""
     line: str = ""
     with open(cmake_toolchain_filepath, 'r') as file:
-        while (line := file.readline()):
-            if include_paths_pattern.match(line):
+        for line in file:
+            if line.lstrip().startswith(include_paths_prefix):
                 break
 
+    # Only the found line goes through the regex
     paths_str: str = include_paths_pattern.search(line).group(1)
     return paths_str.replace('"', '').split(' ')
 
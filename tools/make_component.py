@@ -29,13 +29,21 @@ Janus Bo Andersen, June 2023.
 import sys
 import os
 from datetime import date
+from typing import List
 from jinja2 import Environment, FileSystemLoader, select_autoescape
 
 env = Environment(
     loader=FileSystemLoader(os.path.join("tools", "templates")),
-    autoescape=select_autoescape()
+    autoescape=select_autoescape(),
+    auto_reload=False,              # Templates don't change while the script runs, so never re-stat them
+    cache_size=-1                   # Keep every loaded template
 )
 
+# Each template is loaded and parsed once
+header_template = env.get_template("header.hpp.jinja2")
+source_template = env.get_template("source.cpp.jinja2")
+test_template = env.get_template("test.cpp.jinja2")
+
 HEADER_EXT = ".hpp"
 SOURCE_EXT = ".cpp"
 
@@ -100,22 +108,25 @@ def make_test_rel_path_with_filename(group: str, component_longname: str) -> str
     )
 
 
-# File system effects: Creates full path and writes to file, but doesn't overwrite any existing files
+# File system effects: Creates each full path once (shared paths are only attempted once)
+def make_paths(basepath: str, rel_paths: List[str]) -> None:
+    for rel_path in dict.fromkeys(rel_paths):       # Deduplicated, in order
+        path = os.path.join(basepath, rel_path)
+        try:
+            os.makedirs(path)
+            print("Making path: " + path)
+        except FileExistsError:
+            pass                                    # Already there
+
+# File system effects: Writes to file in an existing path, but doesn't overwrite any existing files
 def write_to_file(basepath: str, rel_path: str, filename: str, textdata: str) -> int:
-    path = os.path.join(basepath, rel_path)
-    path_and_file = os.path.join(path, filename)
-
-    if not os.path.exists(path):
-        print("Making path: " + path)
-        os.makedirs(path)
-
-    if not os.path.isfile(path_and_file):
-        print("Making file: " + path_and_file)
-        f = open(path_and_file, "wt")
-        n = f.write(textdata)
-        f.close()
-        return n
-    else:
+    path_and_file = os.path.join(basepath, rel_path, filename)
+
+    try:
+        with open(path_and_file, "xt") as f:        # Exclusive creation: fails if the file exists
+            print("Making file: " + path_and_file)
+            return f.write(textdata)
+    except FileExistsError:
         print("File already exists: " + path_and_file)
         return 0
 
@@ -137,32 +148,30 @@ if __name__ == "__main__":
         "component_namespace": component_group
     }
 
-    # Build header file
-    header_template = env.get_template("header.hpp.jinja2")
-    write_to_file(
-        os.getcwd(),
-        make_header_rel_path(component_group, component_longname),
-        make_header_filename(component_group, component_longname),
-        header_template.render(**render_vars)
-    )
-
-    # Build source file
-    source_template = env.get_template("source.cpp.jinja2")
-    write_to_file(
-        os.getcwd(),
-        make_source_rel_path(component_group, component_longname),
-        make_source_filename(component_group, component_longname),
-        source_template.render(**render_vars)
-    )
-
-    # Build test file
-    test_template = env.get_template("test.cpp.jinja2")
-    write_to_file(
-        os.getcwd(),
-        make_test_rel_path(component_group, component_longname),
-        make_test_filename(component_group, component_longname),
-        test_template.render(**render_vars)
-    )
+    # Header, source and test file: (path, filename, template)
+    component_files = [
+        (
+            make_header_rel_path(component_group, component_longname),
+            make_header_filename(component_group, component_longname),
+            header_template
+        ),
+        (
+            make_source_rel_path(component_group, component_longname),
+            make_source_filename(component_group, component_longname),
+            source_template
+        ),
+        (
+            make_test_rel_path(component_group, component_longname),
+            make_test_filename(component_group, component_longname),
+            test_template
+        ),
+    ]
+
+    # Make all paths first, then render and build each file
+    basepath = os.getcwd()
+    make_paths(basepath, [rel_path for rel_path, _, _ in component_files])
+    for rel_path, filename, template in component_files:
+        write_to_file(basepath, rel_path, filename, template.render(**render_vars))
 
     # Give user strings to copy to CMakeLists
 